@@ -21,15 +21,30 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 ################################################################################
-from typing import List
+from typing import List, Optional
 from .tokenizer import Tokenizer    # type: ignore
+from .incremental import IncrementalTokenizer   # type: ignore
 
 
-def tokenize(s: str) -> List[str]:
+def tokenize(
+    s: str,
+    include_pos: Optional[List[str]] = None,
+    exclude_pos: Optional[List[str]] = None
+) -> List[str]:
     tok = Tokenizer()
-    return tok.tokenize(s)
+    return tok.tokenize(s, include_pos, exclude_pos)
 
 
-def tokenize_n_best(s: str, n: int) -> List[List[str]]:
+def tokenize_n_best(
+    s: str,
+    n: int,
+    include_pos: Optional[List[str]] = None,
+    exclude_pos: Optional[List[str]] = None
+) -> List[List[str]]:
     tok = Tokenizer()
-    return tok.tokenize_n_best(s, n)
+    return tok.tokenize_n_best(s, n, include_pos, exclude_pos)
+
+
+def wakati(s: str) -> List[str]:
+    tok = Tokenizer()
+    return tok.wakati(s)
@@ -0,0 +1,75 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020-2021 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+# client of `pyawabi serve`
+import json
+import socket
+
+
+class Client:
+    def __init__(self, path=None, host="127.0.0.1", port=8765, timeout=None):
+        if path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout)
+        self.rfile = self.sock.makefile('rb')
+        self.req_id = 0
+
+    def request(self, op, **kwargs):
+        self.req_id += 1
+        req = dict(kwargs, id=self.req_id, op=op)
+        self.sock.sendall((json.dumps(req, ensure_ascii=False) + "\n").encode('utf-8'))
+        res = json.loads(self.rfile.readline())
+        if "error" in res:
+            raise RuntimeError(res["error"])
+        return res["result"]
+
+    def tokenize(self, s, include_pos=None, exclude_pos=None):
+        return [
+            tuple(token) for token in
+            self.request("tokenize", text=s, include_pos=include_pos, exclude_pos=exclude_pos)
+        ]
+
+    def tokenize_n_best(self, s, n, include_pos=None, exclude_pos=None):
+        return [
+            [tuple(token) for token in tokens] for tokens in
+            self.request("nbest", text=s, n=n, include_pos=include_pos, exclude_pos=exclude_pos)
+        ]
+
+    def wakati(self, s):
+        return self.request("wakati", text=s)
+
+    def stats(self):
+        return self.request("stats")
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
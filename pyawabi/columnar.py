@@ -0,0 +1,164 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020-2021 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+# columnar tokenize results and output formats
+#
+# binary format (little endian)
+#   b"AWB1"
+#   uint32 number of features, then for each feature: uint32 length, utf-8 bytes
+#   uint32 number of tokens n, then
+#   uint32 sentence_ids[n], uint32 starts[n], uint32 ends[n], uint16 posids[n], uint32 feature_ids[n]
+import json
+import re
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+BINARY_MAGIC = b"AWB1"
+
+
+class Columnar(namedtuple("Columnar", ["sentence_ids", "starts", "ends", "posids", "feature_ids", "features"])):
+    # parallel arrays of tokens, features is the interned feature table
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.sentence_ids)
+
+    def surfaces(self, sentences):
+        return [
+            sentences[sid][start:end] for sid, start, end in zip(self.sentence_ids, self.starts, self.ends)
+        ]
+
+    def to_dict(self):
+        return {
+            "sentence_ids": self.sentence_ids.tolist(),
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "posids": self.posids.tolist(),
+            "feature_ids": self.feature_ids.tolist(),
+            "features": self.features,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def to_binary(self):
+        buf = [BINARY_MAGIC, struct.pack('<I', len(self.features))]
+        for feature in self.features:
+            b = feature.encode('utf-8')
+            buf.append(struct.pack('<I', len(b)))
+            buf.append(b)
+        buf.append(struct.pack('<I', len(self)))
+        for column in self[:5]:
+            if sys.byteorder != 'little':
+                column = array(column.typecode, column)
+                column.byteswap()
+            buf.append(column.tobytes())
+        return b"".join(buf)
+
+    @classmethod
+    def from_binary(cls, data):
+        if data[:4] != BINARY_MAGIC:
+            raise ValueError("not a columnar binary")
+        pos = 4
+        n = struct.unpack_from('<I', data, pos)[0]
+        pos += 4
+        features = []
+        for i in range(n):
+            ln = struct.unpack_from('<I', data, pos)[0]
+            features.append(bytes(data[pos+4:pos+4+ln]).decode('utf-8'))
+            pos += 4 + ln
+        n = struct.unpack_from('<I', data, pos)[0]
+        pos += 4
+        columns = []
+        for typecode in "IIIHI":
+            column = array(typecode)
+            column.frombytes(data[pos:pos+n*column.itemsize])
+            if sys.byteorder != 'little':
+                column.byteswap()
+            pos += n * column.itemsize
+            columns.append(column)
+        return cls(*columns, features)
+
+
+def compile_node_format(fmt):
+    # MeCab --node-format subset to a function (surface, feature, start, end) -> str
+    #   %m %M surface, %H feature, %f[N] feature field N, %F<sep>[N1,N2,...] fields joined by <sep>,
+    #   %ps %pe start and end position, %% '%', and \t \n \\ escapes
+    parts = []
+    # feature -> its fields, local to this format so nothing is shared between callers
+    fields_cache = {}
+
+    def get_field(feature, i):
+        fields = fields_cache.get(feature)
+        if fields is None:
+            fields = fields_cache[feature] = feature.split(",")
+        return fields[i] if i < len(fields) else ""
+
+    pattern = re.compile(r'%(?:([mMH%])|f\[(\d+)\]|F(.)\[([\d,]+)\]|p([se]))|\\(.)|([^%\\]+)')
+    pos = 0
+    while pos < len(fmt):
+        m = pattern.match(fmt, pos)
+        if m is None:
+            raise ValueError("invalid node format: {}".format(fmt[pos:]))
+        pos = m.end()
+        spec, field, sep, fields, p, escape, literal = m.groups()
+        if spec in ("m", "M"):
+            parts.append(lambda surface, feature, start, end: surface)
+        elif spec == "H":
+            parts.append(lambda surface, feature, start, end: feature)
+        elif spec == "%":
+            parts.append("%")
+        elif field is not None:
+            parts.append(lambda surface, feature, start, end, i=int(field): get_field(feature, i))
+        elif fields is not None:
+            parts.append(
+                lambda surface, feature, start, end, sep=sep, fields=[int(i) for i in fields.split(",")]:
+                sep.join(get_field(feature, i) for i in fields)
+            )
+        elif p == "s":
+            parts.append(lambda surface, feature, start, end: str(start))
+        elif p == "e":
+            parts.append(lambda surface, feature, start, end: str(end))
+        elif escape is not None:
+            parts.append({"t": "\t", "n": "\n", "s": " "}.get(escape, escape))
+        else:
+            parts.append(literal)
+
+    # merge the literals
+    merged = []
+    for part in parts:
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    if all(isinstance(part, str) for part in merged):
+        text = "".join(merged)
+        return lambda surface, feature, start, end: text
+
+    def node_format(surface, feature, start, end):
+        return "".join(
+            part if isinstance(part, str) else part(surface, feature, start, end) for part in merged
+        )
+    return node_format
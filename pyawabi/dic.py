@@ -24,6 +24,7 @@
 
 import mmap
 import struct
+import threading
 from functools import lru_cache
 from collections import namedtuple
 
@@ -86,6 +87,19 @@ class CharProperty:
 
         return i
 
+    def get_unknown_extent(self, s):
+        # bytes of s read by get_unknown_lengths(), len(s) + 1 when it reads to the end
+        ch16, i = utf8_to_ucs2(s, 0)
+        default_type = self.get_char_info(ch16)[0]
+        char_count = 1
+        while i < len(s) and char_count <= MAX_GROUPING_SIZE + 1:
+            ch16, ln = utf8_to_ucs2(s, i)
+            i += ln
+            if ((1 << default_type) & self.get_char_type(ch16)) == 0:
+                return i
+            char_count += 1
+        return len(s) + 1 if i >= len(s) else i
+
     def get_count_length(self, s, default_type, count):
         i = j = 0
         while j < count:
@@ -144,6 +158,8 @@ class MecabDic:
             self.da_offset = 72
             self.token_offset = 72 + dsize
             self.feature_offset = self.token_offset + tsize
+            # entries cache for each thread, no lock between threads
+            self._local = threading.local()
 
     def _get_base_check(self, idx):
         return struct.unpack_from('iI', self.mmap, self.da_offset + idx * 8)
@@ -166,14 +182,15 @@ class MecabDic:
 
         return v
 
-    def common_prefix_search(self, s):
+    def common_prefix_search(self, s, start=0):
+        # (result, length) of the keys which are prefixes of s[start:], without copying s
         results = []
         b, _ = self._get_base_check(0)
-        for i in range(len(s)):
+        for i in range(start, len(s)):
             p = b
             n, check = self._get_base_check(p)
             if b == check and n < 0:
-                results.append((-n-1, i))
+                results.append((-n-1, i - start))
             p = b + s[i] + 1
             base, check = self._get_base_check(p)
             if b == check:
@@ -184,11 +201,139 @@ class MecabDic:
         p = b
         n, check = self._get_base_check(p)
         if b == check and n < 0:
-            results.append((-n-1, len(s)))
+            results.append((-n-1, len(s) - start))
+        return results
+
+    def _common_length(self, s, prev, n):
+        # common prefix length of s and prev, up to n
+        i = 0
+        n = min(n, len(s), len(prev))
+        while i < n and s[i] == prev[i]:
+            i += 1
+        return i
+
+    def exact_match_search_many(self, keys):
+        # exact_match_search() of each key, sorted keys share the trie walk of the common prefix
+        results = [-1] * len(keys)
+        prev = b""
+        nodes = [self._get_base_check(0)[0]]    # nodes[i]: node after prev[:i]
+        for k in sorted(range(len(keys)), key=keys.__getitem__):
+            s = keys[k]
+            i = self._common_length(s, prev, len(nodes) - 1)
+            del nodes[i+1:]
+            b = nodes[i]
+            while i < len(s):
+                base, check = self._get_base_check(b + s[i] + 1)
+                if b != check:
+                    break
+                b = base
+                nodes.append(b)
+                i += 1
+            else:
+                n, check = self._get_base_check(b)
+                if b == check and n < 0:
+                    results[k] = -n-1
+            prev = s
+        return results
+
+    def common_prefix_search_many(self, keys):
+        # common_prefix_search() of each key, sorted keys share the trie walk of the common prefix
+        results = [None] * len(keys)
+        prev = b""
+        b = self._get_base_check(0)[0]
+        nodes = [b]     # nodes[i]: node after prev[:i]
+        n, check = self._get_base_check(b)
+        matched = [(-n-1, 0)] if b == check and n < 0 else []
+        for k in sorted(range(len(keys)), key=keys.__getitem__):
+            s = keys[k]
+            i = self._common_length(s, prev, len(nodes) - 1)
+            del nodes[i+1:]
+            while matched and matched[-1][1] > i:
+                matched.pop()
+            b = nodes[i]
+            while i < len(s):
+                base, check = self._get_base_check(b + s[i] + 1)
+                if b != check:
+                    break
+                b = base
+                nodes.append(b)
+                i += 1
+                n, check = self._get_base_check(b)
+                if b == check and n < 0:
+                    matched.append((-n-1, i))
+            results[k] = matched[:]
+            prev = s
+        return results
+
+    def find_all(self, s):
+        # (start, end, result) of every dictionary word in s, start and end are byte offsets
+        results = []
+        for start in range(len(s)):
+            if (s[start] & 0b11000000) == 0b10000000:
+                continue    # not the first byte of a utf-8 character
+            # the walk from start stops at the first byte without a trie edge
+            for result, ln in self.common_prefix_search(s, start):
+                if ln:
+                    results.append((start, start + ln, result))
         return results
 
-    @lru_cache(maxsize=1024)
+    def _children(self, b):
+        # (code, node) of b in code order, code -1 is the end of a key and node is its result
+        mmap = self.mmap
+        pattern = struct.pack('I', b)
+        start = self.da_offset + b * 8 + 4
+        end = min(start + 256 * 8 + 4, self.token_offset)
+        i = mmap.find(pattern, start, end)
+        while i >= 0:
+            if (i - start) % 8 == 0:
+                code = (i - start) // 8 - 1
+                base = struct.unpack_from('i', mmap, i - 4)[0]
+                if code < 0:
+                    if base < 0:
+                        yield -1, -base-1
+                elif base >= 0:
+                    yield code, base
+            i = mmap.find(pattern, i + 1, end)
+
+    def keys(self, prefix=b""):
+        # (key, result) of the keys which start with prefix in byte order
+        b = self._get_base_check(0)[0]
+        for c in prefix:
+            base, check = self._get_base_check(b + c + 1)
+            if b != check:
+                return
+            b = base
+
+        stack = [(prefix, iter(self._children(b)))]
+        while stack:
+            key, children = stack[-1]
+            for code, node in children:
+                if code < 0:
+                    yield key, node
+                else:
+                    stack.append((key + bytes([code]), iter(self._children(node))))
+                    break
+            else:
+                stack.pop()
+
+    def common_prefix_extent(self, s):
+        # bytes of s read by common_prefix_search(), len(s) + 1 when it reads to the end
+        b, _ = self._get_base_check(0)
+        for i in range(len(s)):
+            base, check = self._get_base_check(b + s[i] + 1)
+            if b != check:
+                return i + 1
+            b = base
+        return len(s) + 1
+
     def _get_entries_by_index(self, idx, count):
+        try:
+            cached = self._local.get_entries_by_index
+        except AttributeError:
+            cached = self._local.get_entries_by_index = lru_cache(maxsize=1024)(self._read_entries_by_index)
+        return cached(idx, count)
+
+    def _read_entries_by_index(self, idx, count):
         mmap = self.mmap
         feature_offset = self.feature_offset
 
@@ -237,6 +382,39 @@ class MecabDic:
             )
         return results, invoke
 
+    # surface only (wakati) lookups, (length, lc_attr, rc_attr, wcost) without the
+    # surface bytes and the feature section, cached apart from the entries
+
+    def _get_costs_by_index(self, idx, count):
+        try:
+            cached = self._local.get_costs_by_index
+        except AttributeError:
+            cached = self._local.get_costs_by_index = lru_cache(maxsize=1024)(self._read_costs_by_index)
+        return cached(idx, count)
+
+    def _read_costs_by_index(self, idx, count):
+        start = self.token_offset + idx * 16
+        return tuple(
+            struct.unpack_from('HH2xh', self.mmap, i) for i in range(start, start+count*16, 16)
+        )
+
+    def lookup_costs(self, s, start=0):
+        # lookup() of s[start:] without copying s
+        results = []
+        for result, ln in self.common_prefix_search(s, start):
+            for lc_attr, rc_attr, wcost in self._get_costs_by_index(result >> 8, result & 0xff):
+                results.append((ln, lc_attr, rc_attr, wcost))
+        return results
+
+    def lookup_unknown_costs(self, s, cp):
+        # lookup_unknowns() as (length, lc_attr, rc_attr, wcost, skip)
+        default_type, ln_list, _ = cp.get_unknown_lengths(s)
+        category_name = cp.category_names[default_type]
+        result = self.exact_match_search(category_name)
+        skip = category_name == b"SPACE"
+        costs = self._get_costs_by_index(result >> 8, result & 0xff)
+        return [(ln, lc_attr, rc_attr, wcost, skip) for ln in ln_list for lc_attr, rc_attr, wcost in costs]
+
 
 class Matrix:
     def __init__(self, path):
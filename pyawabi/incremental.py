@@ -0,0 +1,405 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020-2021 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+import itertools
+from .tokenizer import Tokenizer
+from .lattice import Lattice, Node
+
+SEGMENT_SIZE = 256      # bytes, adjacent segments smaller than this are merged
+
+
+class Segment:
+    # lattice positions [lo, hi) of snodes, which may be shared with the other
+    # segments cut from the same lattice. Positions in snodes and in the nodes
+    # are relative to base, node costs to cost, so a segment after an edit is
+    # moved without touching its nodes.
+
+    def __init__(self, snodes, extents, lo, hi, base, cost, b, text):
+        self.snodes = snodes
+        self.extents = extents
+        self.lo = lo
+        self.hi = hi
+        self.base = base
+        self.cost = cost
+        self.b = b
+        self.text = text
+        # nodes of the best path which start in this segment, and their morphemes
+        self.path = []
+        self.morphemes = []
+
+    def split(self, p):
+        # (segment before lattice position p, segment from p)
+        q = p - self.base
+        b = self.b[:q - self.lo]
+        text = b.decode('utf-8')
+        left = Segment(self.snodes, self.extents, self.lo, q, self.base, self.cost, b, text)
+        right = Segment(self.snodes, self.extents, q, self.hi, self.base, self.cost,
+                        self.b[q - self.lo:], self.text[len(text):])
+        i = 0
+        while i < len(self.path) and self.path[i].pos < q:
+            i += 1
+        left.path, right.path = self.path[:i], self.path[i:]
+        left.morphemes, right.morphemes = self.morphemes[:i], self.morphemes[i:]
+        return left, right
+
+
+class IncrementalTokenizer:
+    """Tokenizer session which keeps the lattice of the current text.
+
+    The lattice is kept in segments of about SEGMENT_SIZE bytes, with the
+    best path through each of them. edit() rebuilds the lattice from the
+    first position whose dictionary lookups read the edited bytes, and
+    stops as soon as every node which crosses the current position is an
+    unchanged node whose forward cost differs from the old lattice by one
+    constant. The segments after that position are reused by moving their
+    base position and cost, and the best path is walked back from there
+    until it meets the old one.
+
+    The time of an edit depends on the edit and the segments around it.
+    The length of the text only adds a loop over the segments and the
+    concatenation of the returned list.
+    """
+
+    def __init__(self, tokenizer=None, s=""):
+        self.tokenizer = tokenizer if tokenizer is not None else Tokenizer()
+        self.set_text(s)
+
+    @property
+    def text(self):
+        return "".join(seg.text for seg in self.segments)
+
+    def set_text(self, s):
+        lat = Lattice(0)
+        lat.end(self.tokenizer.matrix)
+        self.segments = [Segment(lat.snodes, [0, 0], 1, 2, 0, 0, b"", "")]
+        self.length = 0
+        # longest read (and so the longest node) seen in this session
+        self.max_read = 1
+        return self.edit(0, 0, s)
+
+    def edit(self, offset, length, s):
+        # replace self.text[offset:offset+length] (in characters) by s
+        if length < 0:
+            raise ValueError("negative length: {}".format(length))
+        if not 0 <= offset <= offset + length <= self.length:
+            raise IndexError("edit range {}:{} out of text of length {}".format(
+                offset, offset + length, self.length))
+        old = self.segments
+        i, bo = self._locate(offset)
+        j, be = self._locate(offset + length)
+
+        # first position whose lookups read the edited bytes
+        r = bo + 1
+        for p in range(max(1, bo + 1 - self.max_read), bo + 1):
+            i = self._segment(old, p, i)
+            seg = old[i]
+            ln = seg.extents[p - seg.base]
+            if seg.snodes[p - seg.base] and (ln < 0 or p - 1 + ln > bo):
+                r = p
+                break
+
+        # build the lattice from r in a window, whose position 0 is a
+        a = max(0, r - 2 * self.max_read - 2)
+        lat = Lattice(0)
+        window = Segment(lat.snodes, [], r - a, r - a, a, 0, b"", "")
+        self._reserve(lat, window.extents, r - a + self.max_read + 2)
+        i = self._segment(old, r, i)
+        self._copy_context(lat, old, i, r, a)
+        lat.p = r - a
+        segments = old[:i]
+        if old[i].base + old[i].lo < r:
+            segments.append(old[i].split(r)[0])
+        head = self._bytes(old, i, r - 1, bo - r + 1) + s.encode('utf-8')
+        c = self._build(lat, window, segments + [window], old, j, head, be)
+        self.length += len(s) - length
+
+        w0 = len(segments)
+        segments += self._cut(window)
+        w1 = len(segments)
+        if c is not None:
+            # reuse the old segments from where the window converged
+            delta = r - 1 + len(head) - be
+            q = window.base + window.hi - delta
+            j = self._segment(old, q, j)
+            right = old[j].split(q)[1]
+            right.base += delta
+            right.cost += c
+            segments.append(right)
+            for seg in old[j + 1:]:
+                seg.base += delta
+                seg.cost += c
+                segments.append(seg)
+
+        # the first node of the best path after the window, EOS at the last
+        k = w1 if w1 < len(segments) else w1 - 1
+        while not segments[k].path and k < len(segments) - 1:
+            k += 1
+        seg = segments[k]
+        x = seg.path[0] if seg.path and k >= w1 else seg.snodes[seg.hi - 1][0]
+        self._update_path(segments, w0, w1, k, x)
+        self._compact(segments, max(0, w0 - 2), min(len(segments), w1 + 2))
+        self.segments = segments
+        return self.tokenize()
+
+    def tokenize(self):
+        return list(itertools.chain.from_iterable(seg.morphemes for seg in self.segments))
+
+    def _locate(self, offset):
+        # (index of the segment, byte position) of the character offset
+        chars = 0
+        for i, seg in enumerate(self.segments):
+            if offset <= chars + len(seg.text):
+                return i, seg.base + seg.lo - 1 + len(seg.text[:offset - chars].encode('utf-8'))
+            chars += len(seg.text)
+
+    def _segment(self, segments, p, i):
+        # index of the segment with lattice position p, searched from index i
+        while p < segments[i].base + segments[i].lo:
+            i -= 1
+        while p >= segments[i].base + segments[i].hi:
+            i += 1
+        return i
+
+    def _bytes(self, segments, i, start, n):
+        # text bytes [start, start+n) of segments, searched from index i
+        i = self._segment(segments, start + 1, i)
+        chunks = []
+        while n > 0 and i < len(segments):
+            seg = segments[i]
+            k = start - (seg.base + seg.lo - 1)
+            chunk = seg.b[k:k + n]
+            chunks.append(chunk)
+            start += len(chunk)
+            n -= len(chunk)
+            i += 1
+        return b"".join(chunks)
+
+    def _enodes(self, segments, i, p):
+        # [(node, segment)] of the nodes which end at lattice position p
+        results = []
+        for p2 in range(max(1, p - self.max_read), p):
+            i = self._segment(segments, p2, i)
+            seg = segments[i]
+            for node in seg.snodes[p2 - seg.base]:
+                if node.epos + seg.base == p:
+                    results.append((node, seg))
+        return results
+
+    def _copy_context(self, lat, segments, i, r, a):
+        # copy the nodes which the nodes from r connect to into the window
+        def copy(node, seg):
+            d = seg.base - a
+            node = Node(
+                node.original, node.feature, node.pos + d, node.epos + d, node.index,
+                node.left_id, node.right_id, node.cost, node.min_cost + seg.cost,
+                node.back_pos + d, node.back_index, node.skip, node.posid
+            )
+            lat.snodes[node.pos].append(node)
+            lat.enodes[node.epos].append(node)
+
+        skipped = set()
+        for p in range(max(1, r - self.max_read), r):
+            i = self._segment(segments, p, i)
+            seg = segments[i]
+            for node in seg.snodes[p - seg.base]:
+                if node.epos + seg.base < r:
+                    continue
+                copy(node, seg)
+                if node.skip and p not in skipped:
+                    skipped.add(p)
+                    for enode, eseg in self._enodes(segments, i, p):
+                        copy(enode, eseg)
+
+    def _reserve(self, lat, extents, size):
+        while len(lat.snodes) < size:
+            lat.snodes.append([])
+        while len(lat.enodes) < size + 1:
+            lat.enodes.append([])
+        while len(extents) < size:
+            extents.append(0)
+
+    def _build(self, lat, window, segments, old, j, head, be):
+        # build the window lattice from the bytes head followed by the old
+        # bytes from be, return the cost difference to the old lattice where
+        # they converge, or None at the end of the text
+        tok = self.tokenizer
+        extents, o = window.extents, window.lo
+        r = window.base + o
+        edit_end = r - 1 + len(head)
+        delta = edit_end - be
+        n = 2 * self.max_read + 64
+        tail = self._bytes(old, j, be, n)
+        s = head + tail
+        pos = 0
+        while pos < len(s):
+            if pos >= len(head):
+                window.hi = o + pos
+                c = self._converged(segments, old, j, r + pos, edit_end, delta)
+                if c is not None:
+                    window.b = s[:pos]
+                    return c
+
+            ln = tok.read_length(s[pos:])
+            if ln > len(s) - pos:
+                if len(tail) == n:
+                    # read more of the old text
+                    n *= 2
+                    tail = self._bytes(old, j, be, n)
+                    s = head + tail
+                    continue
+                extents[o + pos] = -1
+                ln = len(s) - pos
+            else:
+                extents[o + pos] = ln
+            self.max_read = max(self.max_read, ln)
+            self._reserve(lat, extents, o + pos + ln + 2)
+
+            tok.add_nodes(lat, s, pos)
+            pos += lat.forward()
+
+        self._reserve(lat, extents, o + len(s) + 2)
+        lat.end(tok.matrix)
+        window.snodes = lat.snodes
+        window.hi = lat.p + 1
+        window.b = s
+        return None
+
+    def _frontier(self, segments, i, q, edit_end):
+        # {(q - pos, index): cost} of nodes the costs after q depend on
+        nodes = {}
+        for p in range(max(1, q - self.max_read), q):
+            i = self._segment(segments, p, i)
+            seg = segments[i]
+            for node in seg.snodes[p - seg.base]:
+                if node.epos + seg.base < q:
+                    continue
+                if p - 1 < edit_end:
+                    return None
+                nodes[(q - p, node.index)] = node.min_cost + seg.cost
+                if node.skip:
+                    if p == 1:
+                        return None     # skips to BOS
+                    for enode, eseg in self._enodes(segments, i, p):
+                        if enode.pos + eseg.base - 1 < edit_end:
+                            return None
+                        nodes[(q - enode.pos - eseg.base, enode.index)] = enode.min_cost + eseg.cost
+        return nodes
+
+    def _converged(self, segments, old, j, q, edit_end, delta):
+        # cost difference between the new and old lattice at q, or None
+        new_frontier = self._frontier(segments, len(segments) - 1, q, edit_end)
+        if not new_frontier:
+            return None
+        old_frontier = self._frontier(old, j, q - delta, edit_end - delta)
+        if old_frontier is None or new_frontier.keys() != old_frontier.keys():
+            return None
+        costs = {new_frontier[k] - old_frontier[k] for k in new_frontier}
+        if len(costs) != 1:
+            return None
+        return costs.pop()
+
+    def _cut(self, window):
+        # window as segments of about SEGMENT_SIZE bytes
+        segments = []
+        b, start = window.b, 0
+        while len(b) - start >= 2 * SEGMENT_SIZE:
+            end = start + SEGMENT_SIZE
+            while b[end] & 0xC0 == 0x80:
+                end += 1
+            segments.append(Segment(
+                window.snodes, window.extents, window.lo + start, window.lo + end,
+                window.base, window.cost, b[start:end], b[start:end].decode('utf-8')
+            ))
+            start = end
+        window.lo += start
+        window.b = b[start:]
+        window.text = window.b.decode('utf-8')
+        segments.append(window)
+        return segments
+
+    def _update_path(self, segments, w0, w1, k, x):
+        # walk back the best path from x in segments[k] until it meets the
+        # old path before the window segments[w0:w1]
+        found = []
+        m, n = 0, 0         # segments[m].path[:n] is kept
+        seg, node = segments[k], x
+        pk, pi = -1, -1
+        while True:
+            p = node.back_pos + seg.base
+            if p == 0:
+                break
+            k = self._segment(segments, p, k)
+            seg = segments[k]
+            node = seg.snodes[p - seg.base][node.back_index]
+            if k < w0:
+                if k != pk:
+                    pk, pi = k, len(seg.path) - 1
+                while pi >= 0 and seg.path[pi].pos > node.pos:
+                    pi -= 1
+                if pi >= 0 and seg.path[pi] is node:
+                    m, n = k, pi + 1
+                    break
+            found.append((k, node))
+
+        for i in range(m, w1):
+            del segments[i].path[n if i == m else 0:]
+            del segments[i].morphemes[n if i == m else 0:]
+        for i, node in reversed(found):
+            segments[i].path.append(node)
+            segments[i].morphemes.append(
+                (node.original.decode('utf-8'), node.feature.decode('utf-8'))
+            )
+
+    def _compact(self, segments, lo, hi):
+        # merge runs of small segments which end in segments[lo:hi]
+        j = hi
+        while j > lo:
+            i = j
+            while i > 0 and len(segments[i - 1].b) < SEGMENT_SIZE:
+                i -= 1
+            if j - i > 1:
+                segments[i:j] = [self._merge(segments[i:j])]
+            j = i - 1
+
+    def _merge(self, segments):
+        # one segment of segments, their nodes moved to its base and cost
+        base = segments[0].base + segments[0].lo - 1
+        cost = segments[0].cost
+        snodes, extents = [[]], [0]
+        for seg in segments:
+            d, c = seg.base - base, seg.cost - cost
+            for nodes in seg.snodes[seg.lo:seg.hi]:
+                for node in nodes:
+                    node.pos += d
+                    node.epos += d
+                    node.back_pos += d
+                    node.min_cost += c
+                snodes.append(nodes)
+            extents += seg.extents[seg.lo:seg.hi]
+        merged = Segment(
+            snodes, extents, 1, len(snodes), base, cost,
+            b"".join(seg.b for seg in segments), "".join(seg.text for seg in segments)
+        )
+        merged.path = list(itertools.chain.from_iterable(seg.path for seg in segments))
+        merged.morphemes = list(itertools.chain.from_iterable(seg.morphemes for seg in segments))
+        return merged
@@ -27,7 +27,7 @@ import heapq
 
 class Node:
 
-    __slots__ = ["original", "feature", "node_len", "pos", "epos", "index", "left_id", "right_id", "cost", "min_cost", "back_pos", "back_index", "skip"]
+    __slots__ = ["original", "feature", "node_len", "pos", "epos", "index", "left_id", "right_id", "cost", "min_cost", "back_pos", "back_index", "skip", "posid"]
 
     @classmethod
     def create_bos(cls):
@@ -39,9 +39,9 @@ class Node:
 
     @classmethod
     def create_by_entry(cls, e):
-        return cls(e.original, e.feature, 0, 0, e.posid, e.lc_attr, e.rc_attr, e.wcost, 0x7FFFFFFF, -1, -1, e.skip)
+        return cls(e.original, e.feature, 0, 0, e.posid, e.lc_attr, e.rc_attr, e.wcost, 0x7FFFFFFF, -1, -1, e.skip, e.posid)
 
-    def __init__(self, original, feature, pos, epos, index, left_id, right_id, cost, min_cost, back_pos, back_index, skip):
+    def __init__(self, original, feature, pos, epos, index, left_id, right_id, cost, min_cost, back_pos, back_index, skip, posid=0):
         self.original = original
         self.feature = feature
         self.pos = pos
@@ -54,6 +54,7 @@ class Node:
         self.back_pos = back_pos
         self.back_index = back_index
         self.skip = skip
+        self.posid = posid
         self.node_len = len(self.original) if self.original else 1     # 1: BOS or EOS
 
     def is_bos(self):
@@ -68,6 +69,20 @@ class Node:
         return f"{original},{feature},{self.node_len},{self.pos},{self.epos},{self.index},{self.left_id},{self.right_id},{self.cost},{self.min_cost},{self.back_pos},{self.back_index},{self.skip}"
 
 
+class SurfaceNode:
+    # Node without surface, feature and posid for wakati, the surface is s[pos-1:epos-1]
+
+    __slots__ = ["node_len", "pos", "epos", "index", "left_id", "right_id", "cost", "min_cost", "back_pos", "back_index", "skip"]
+
+    def __init__(self, node_len, left_id, right_id, cost, skip):
+        self.node_len = node_len
+        self.left_id = left_id
+        self.right_id = right_id
+        self.cost = cost
+        self.min_cost = 0x7FFFFFFF
+        self.skip = skip
+
+
 class Lattice:
     def __init__(self, size):
         bos = Node.create_bos()
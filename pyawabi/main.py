@@ -1,21 +1,126 @@
 import sys
+import json
 from argparse import ArgumentParser
 from . import tokenizer
+from .columnar import compile_node_format
+
+
+# lines tokenized and written at a time by the streaming columnar formats
+BATCH_LINES = 1000
+
+
+def read_batches(f, size=BATCH_LINES):
+    batch = []
+    for line in f:
+        batch.append(line.rstrip('\n'))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_columnar(t, args, lines, node_format=None):
+    fmt = args.output_format_type
+    c = t.tokenize_columnar(lines, args.byte_offsets, args.include_pos, args.exclude_pos)
+    if fmt == 'binary':
+        sys.stdout.buffer.write(c.to_binary())
+        return
+    if fmt == 'json':
+        sys.stdout.write(c.to_json() + "\n")
+        return
+
+    sentences = [s.encode('utf-8') for s in lines] if args.byte_offsets else lines
+    surfaces = c.surfaces(sentences)
+    if args.byte_offsets:
+        surfaces = [surface.decode('utf-8') for surface in surfaces]
+    features = c.features
+    if fmt == 'tsv-fields':
+        features = [feature.replace(',', '\t') for feature in features]
+
+    buf = []
+    sentence_tokens = [[] for _ in lines]
+    for i, sentence_id in enumerate(c.sentence_ids):
+        sentence_tokens[sentence_id].append(i)
+    for tokens in sentence_tokens:
+        if fmt == 'jsonl':
+            buf.append(json.dumps({
+                "surfaces": [surfaces[i] for i in tokens],
+                "starts": [c.starts[i] for i in tokens],
+                "ends": [c.ends[i] for i in tokens],
+                "posids": [c.posids[i] for i in tokens],
+                "features": [features[c.feature_ids[i]] for i in tokens],
+            }, ensure_ascii=False) + "\n")
+            continue
+        for i in tokens:
+            if node_format:
+                buf.append(node_format(surfaces[i], features[c.feature_ids[i]], c.starts[i], c.ends[i]))
+            else:
+                buf.append("{}\t{}\n".format(surfaces[i], features[c.feature_ids[i]]))
+        buf.append("EOS\n")
+    sys.stdout.write("".join(buf))
+
 
 def main():
     parser = ArgumentParser()
     parser.add_argument('-N', '--nbest', type=int)
+    parser.add_argument('-O', '--output-format-type', choices=['wakati', 'json', 'jsonl', 'tsv-fields', 'binary'])
+    parser.add_argument('-F', '--node-format')
+    parser.add_argument('--byte-offsets', action='store_true')
+    parser.add_argument('--include-pos', action='append')
+    parser.add_argument('--exclude-pos', action='append')
+    subparsers = parser.add_subparsers(dest='command')
+    serve_parser = subparsers.add_parser('serve')
+    serve_parser.add_argument('-r', '--rcfile')
+    serve_parser.add_argument('--unix')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--workers', type=int)
+    serve_parser.add_argument('--batch-size', type=int, default=64)
+    serve_parser.add_argument('--batch-wait', type=float, default=0.002)
     args = parser.parse_args()
 
+    if args.command == 'serve':
+        from . import server
+        server.serve(args)
+        return
+
+    if args.nbest and args.output_format_type is not None:
+        parser.error("-N/--nbest can not be used with -O/--output-format-type")
+    columnar = args.output_format_type in ('json', 'jsonl', 'tsv-fields', 'binary')
+    if args.node_format is not None:
+        if args.nbest or args.output_format_type is not None:
+            parser.error("-F/--node-format can not be used with -N/--nbest or -O/--output-format-type")
+        columnar = True
+    if args.byte_offsets and not columnar:
+        parser.error("--byte-offsets requires -F/--node-format or -O json|jsonl|tsv-fields|binary")
+
     t = tokenizer.Tokenizer()
+    if columnar:
+        if args.output_format_type in ('json', 'binary'):
+            # a single document for the whole input
+            write_columnar(t, args, [s.rstrip('\n') for s in sys.stdin])
+            return
+        node_format = compile_node_format(args.node_format) if args.node_format is not None else None
+        for lines in read_batches(sys.stdin):
+            write_columnar(t, args, lines, node_format)
+            sys.stdout.flush()
+        return
+
     for s in sys.stdin.readlines():
-        if args.nbest:
-            for tokens in t.tokenize_n_best(s, args.nbest):
+        if args.output_format_type == 'wakati':
+            if args.include_pos is None and args.exclude_pos is None:
+                print(" ".join(t.wakati(s.rstrip('\n'))))
+            else:
+                # the filters need the features, which wakati() does not read
+                tokens = t.tokenize(s.rstrip('\n'), args.include_pos, args.exclude_pos)
+                print(" ".join(token[0] for token in tokens))
+        elif args.nbest:
+            for tokens in t.tokenize_n_best(s, args.nbest, args.include_pos, args.exclude_pos):
                 for token in tokens:
                     print("{}	{}".format(token[0], token[1]))
                 print("EOS")
         else:
-            for token in t.tokenize(s):
+            for token in t.tokenize(s, args.include_pos, args.exclude_pos):
                 print("{}	{}".format(token[0], token[1]))
             print("EOS")
-
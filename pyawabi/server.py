@@ -0,0 +1,249 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020-2021 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+# JSON lines tokenizer server
+#
+# request:  {"id": 1, "op": "tokenize", "text": "..."}
+#           {"id": 2, "op": "nbest", "text": "...", "n": 2}
+#           {"id": 3, "op": "wakati", "text": "..."}
+#           {"id": 4, "op": "stats"}
+# response: {"id": 1, "result": ...} or {"id": 1, "error": "..."}
+#
+# Requests from all connections are coalesced into batches and each batch is
+# tokenized by one of the worker processes. Every worker maps the same
+# dictionary files, so the dictionaries are shared through the page cache.
+import json
+import os
+import queue
+import signal
+import socketserver
+import stat
+import sys
+import threading
+import time
+from multiprocessing import Pool
+
+from .tokenizer import Tokenizer
+
+MAX_NBEST = 100
+
+_tokenizer = None
+
+
+def _init_worker(rc_path):
+    global _tokenizer
+    _tokenizer = Tokenizer(rc_path)
+
+
+def _call(req):
+    op = req.get("op", "tokenize")
+    text = req.get("text")
+    if not isinstance(text, str):
+        raise ValueError("text must be a string")
+    if op == "tokenize":
+        return _tokenizer.tokenize(text, req.get("include_pos"), req.get("exclude_pos"))
+    elif op == "nbest":
+        n = req.get("n")
+        if type(n) is not int or not 1 <= n <= MAX_NBEST:
+            raise ValueError("n must be an integer from 1 to {}".format(MAX_NBEST))
+        return _tokenizer.tokenize_n_best(text, n, req.get("include_pos"), req.get("exclude_pos"))
+    elif op == "wakati":
+        return _tokenizer.wakati(text)
+    raise ValueError("unknown op: {}".format(op))
+
+
+def _process_batch(reqs):
+    results = []
+    for req in reqs:
+        try:
+            results.append((True, _call(req)))
+        except Exception as e:
+            results.append((False, "{}: {}".format(type(e).__name__, e)))
+    return results
+
+
+class _Request:
+    __slots__ = ["req", "callback"]
+
+    def __init__(self, req, callback):
+        self.req = req
+        self.callback = callback
+
+
+class Batcher:
+    def __init__(self, rc_path=None, workers=None, batch_size=64, batch_wait=0.002):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.pool = Pool(self.workers, _init_worker, (rc_path,))
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = self.batches = self.errors = self.pending = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, req, callback):
+        # callback(ok, result) is called from the result thread of the pool
+        with self.lock:
+            self.requests += 1
+            self.pending += 1
+        self.queue.put(_Request(req, callback))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "uptime": time.time() - self.started,
+                "workers": self.workers,
+                "requests": self.requests,
+                "batches": self.batches,
+                "errors": self.errors,
+                "pending": self.pending,
+                "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            }
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.pool.close()
+        self.pool.join()
+
+    def _run(self):
+        while True:
+            r = self.queue.get()
+            if r is None:
+                return
+            batch = [r]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    r = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if r is None:
+                    self.queue.put(None)
+                    break
+                batch.append(r)
+            with self.lock:
+                self.batches += 1
+            self.pool.apply_async(
+                _process_batch,
+                ([r.req for r in batch],),
+                callback=lambda results, batch=batch: self._done(batch, results),
+                error_callback=lambda e, batch=batch: self._done(batch, [(False, str(e))] * len(batch)),
+            )
+
+    def _done(self, batch, results):
+        for r, (ok, result) in zip(batch, results):
+            with self.lock:
+                self.pending -= 1
+                if not ok:
+                    self.errors += 1
+            r.callback(ok, result)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        wlock = threading.Lock()
+        batcher = self.server.batcher
+
+        def reply(res):
+            data = (json.dumps(res, ensure_ascii=False) + "\n").encode('utf-8')
+            with wlock:
+                # the connection may be closed before the result arrives,
+                # an exception here would kill the result thread of the pool
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except (OSError, ValueError):
+                    pass
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                reply({"id": None, "error": "ValueError: {}".format(e)})
+                continue
+            if not isinstance(req, dict):
+                reply({"id": None, "error": "ValueError: request must be a JSON object"})
+                continue
+            req_id = req.get("id")
+            if req.get("op") == "stats":
+                reply({"id": req_id, "result": batcher.stats()})
+                continue
+
+            def callback(ok, result, req_id=req_id):
+                reply({"id": req_id, "result" if ok else "error": result})
+            batcher.submit(req, callback)
+
+
+class TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def _remove_socket(path):
+    # remove a (stale) unix socket at path, but never any other kind of file
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError("{} exists and is not a socket".format(path))
+    os.unlink(path)
+
+
+def create_server(path=None, host="127.0.0.1", port=8765, **kwargs):
+    if path:
+        _remove_socket(path)
+        server = UnixServer(path, _Handler)
+    else:
+        server = TCPServer((host, port), _Handler)
+    server.batcher = Batcher(**kwargs)
+    return server
+
+
+def serve(args):
+    server = create_server(
+        args.unix, args.host, args.port,
+        rc_path=args.rcfile, workers=args.workers,
+        batch_size=args.batch_size, batch_wait=args.batch_wait,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        if args.unix:
+            _remove_socket(args.unix)
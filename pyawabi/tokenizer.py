@@ -22,9 +22,36 @@
 # SOFTWARE.
 ################################################################################
 
+import heapq
+from array import array
 from . import mecabrc
-from .dic import CharProperty, MecabDic, Matrix
-from .lattice import Lattice, Node
+from .columnar import Columnar
+from .dic import CharProperty, MecabDic, Matrix, utf8_to_ucs2
+from .lattice import Lattice, Node, SurfaceNode
+
+
+def compile_pos_filter(pos_list):
+    # POS prefixes ex) ["名詞", "動詞,自立"] -> field aligned utf-8 prefixes
+    if pos_list is None:
+        return None
+    if isinstance(pos_list, str):
+        pos_list = [pos_list]
+    return tuple(pos.encode('utf-8').rstrip(b',') + b',' for pos in pos_list)
+
+
+def filter_nodes(nodes, include_pos=None, exclude_pos=None):
+    # select nodes by raw feature bytes, before any decoding
+    if include_pos is None and exclude_pos is None:
+        return nodes
+    results = []
+    for node in nodes:
+        feature = node.feature + b','
+        if include_pos is not None and not feature.startswith(include_pos):
+            continue
+        if exclude_pos is not None and feature.startswith(exclude_pos):
+            continue
+        results.append(node)
+    return results
 
 
 class Tokenizer:
@@ -39,33 +66,60 @@ class Tokenizer:
         self.unk_dic = MecabDic(mecabrc.get_dic_path(mecabrc_map, "unk.dic"))
         self.matrix = Matrix(mecabrc.get_dic_path(mecabrc_map, "matrix.bin"))
 
-    def build_lattice(self, s):
-        lat = Lattice(len(s))
-        pos = 0
-        while pos < len(s):
-            matched = False
-
-            # user_dic
-            if self.user_dic:
-                user_entries = self.user_dic.lookup(s[pos:])
-                if user_entries:
-                    for entry in user_entries:
-                        lat.add(Node.create_by_entry(entry), self.matrix)
-                    matched = True
+    def add_nodes(self, lat, s, pos):
+        # add nodes which start at byte position pos (lattice position lat.p)
+        matched = False
 
-            # sys_dic
-            sys_entries = self.sys_dic.lookup(s[pos:])
-            if sys_entries:
-                for entry in sys_entries:
+        # user_dic
+        if self.user_dic:
+            user_entries = self.user_dic.lookup(s[pos:])
+            if user_entries:
+                for entry in user_entries:
                     lat.add(Node.create_by_entry(entry), self.matrix)
                 matched = True
 
-            # unknown
-            unk_entries, invoke = self.unk_dic.lookup_unknowns(s[pos:], self.cp)
-            if invoke or matched is False:
-                for entry in unk_entries:
-                    lat.add(Node.create_by_entry(entry), self.matrix)
+        # sys_dic
+        sys_entries = self.sys_dic.lookup(s[pos:])
+        if sys_entries:
+            for entry in sys_entries:
+                lat.add(Node.create_by_entry(entry), self.matrix)
+            matched = True
+
+        # unknown
+        unk_entries, invoke = self.unk_dic.lookup_unknowns(s[pos:], self.cp)
+        if invoke or matched is False:
+            for entry in unk_entries:
+                lat.add(Node.create_by_entry(entry), self.matrix)
+
+    def add_surface_nodes(self, lat, s, pos):
+        # add_nodes() with SurfaceNode, the same nodes in the same order
+        matrix = self.matrix
+        matched = False
+        for dic in (self.user_dic, self.sys_dic):
+            if dic:
+                for ln, lc_attr, rc_attr, wcost in dic.lookup_costs(s, pos):
+                    lat.add(SurfaceNode(ln, lc_attr, rc_attr, wcost, False), matrix)
+                    matched = True
 
+        # unknown, only looked up when they are added
+        if matched and not self.cp.get_char_info(utf8_to_ucs2(s, pos)[0])[4]:
+            return
+        for ln, lc_attr, rc_attr, wcost, skip in self.unk_dic.lookup_unknown_costs(s[pos:], self.cp):
+            lat.add(SurfaceNode(ln, lc_attr, rc_attr, wcost, skip), matrix)
+
+    def read_length(self, s):
+        # bytes of s read by add_nodes(), len(s) + 1 when it depends on the end of s
+        ln = self.sys_dic.common_prefix_extent(s)
+        if self.user_dic:
+            ln = max(ln, self.user_dic.common_prefix_extent(s))
+        return max(ln, self.cp.get_unknown_extent(s))
+
+    def build_lattice(self, s, surface_only=False):
+        add_nodes = self.add_surface_nodes if surface_only else self.add_nodes
+        lat = Lattice(len(s))
+        pos = 0
+        while pos < len(s):
+            add_nodes(lat, s, pos)
             pos += lat.forward()
 
         lat.end(self.matrix)
@@ -75,26 +129,149 @@ class Tokenizer:
 
         return lat
 
-    def tokenize(self, s):
+    def tokenize(self, s, include_pos=None, exclude_pos=None):
         lat = self.build_lattice(s.encode('utf-8'))
-        nodes = lat.backward()
+        nodes = filter_nodes(
+            lat.backward()[1:-1],
+            compile_pos_filter(include_pos),
+            compile_pos_filter(exclude_pos),
+        )
 
         morphemes = []
-        for node in nodes[1:-1]:
+        for node in nodes:
             morphemes.append(
                 (node.original.decode('utf-8'), node.feature.decode('utf-8'))
             )
         return morphemes
 
-    def tokenize_n_best(self, s, n):
+    def tokenize_n_best(self, s, n, include_pos=None, exclude_pos=None):
+        include_pos = compile_pos_filter(include_pos)
+        exclude_pos = compile_pos_filter(exclude_pos)
         lat = self.build_lattice(s.encode('utf-8'))
         morphemes_list = []
         for nodes in lat.backward_astar(n, self.matrix):
             morphemes = []
-            for node in nodes[1:-1]:
+            for node in filter_nodes(nodes[1:-1], include_pos, exclude_pos):
                 morphemes.append(
                     (node.original.decode('utf-8'), node.feature.decode('utf-8'))
                 )
             morphemes_list.append(morphemes)
 
         return morphemes_list
+
+    def wakati(self, s):
+        b = s.encode('utf-8')
+        lat = self.build_lattice(b, True)
+        return [b[node.pos - 1:node.epos - 1].decode('utf-8') for node in lat.backward()[1:-1]]
+
+    def wakati_offsets(self, s):
+        # (start, end) character offsets of each surface in s
+        b = s.encode('utf-8')
+        lat = self.build_lattice(b, True)
+        offsets = []
+        byte_pos = char_pos = 0
+        for node in lat.backward()[1:-1]:
+            # skipped spaces are not on the path, count them too
+            char_pos += len(b[byte_pos:node.pos - 1].decode('utf-8'))
+            start = char_pos
+            byte_pos = node.epos - 1
+            char_pos += len(b[node.pos - 1:byte_pos].decode('utf-8'))
+            offsets.append((start, char_pos))
+        return offsets
+
+    def tokenize_columnar(self, sentences, byte_offsets=False, include_pos=None, exclude_pos=None):
+        include_pos = compile_pos_filter(include_pos)
+        exclude_pos = compile_pos_filter(exclude_pos)
+        sentence_ids, starts, ends = array('I'), array('I'), array('I')
+        posids, feature_ids = array('H'), array('I')
+        feature_table = {}
+        for sentence_id, s in enumerate(sentences):
+            b = s.encode('utf-8')
+            lat = self.build_lattice(b)
+            byte_pos = char_pos = 0
+            for node in filter_nodes(lat.backward()[1:-1], include_pos, exclude_pos):
+                if byte_offsets:
+                    starts.append(node.pos - 1)
+                    ends.append(node.epos - 1)
+                else:
+                    char_pos += len(b[byte_pos:node.pos - 1].decode('utf-8'))
+                    starts.append(char_pos)
+                    char_pos += len(node.original.decode('utf-8'))
+                    ends.append(char_pos)
+                    byte_pos = node.epos - 1
+                sentence_ids.append(sentence_id)
+                posids.append(node.posid)
+                feature_id = feature_table.get(node.feature)
+                if feature_id is None:
+                    feature_id = feature_table[node.feature] = len(feature_table)
+                feature_ids.append(feature_id)
+
+        features = [feature.decode('utf-8') for feature in feature_table]
+        return Columnar(sentence_ids, starts, ends, posids, feature_ids, features)
+
+    # dictionary API, keys are str and entries are (surface, feature) like tokenize()
+
+    def _dics(self):
+        return [self.user_dic, self.sys_dic] if self.user_dic else [self.sys_dic]
+
+    def _entries(self, dic, result, surface):
+        return [
+            (surface, entry.feature.decode('utf-8')) for entry in dic.get_entries(result, b"", False)
+        ]
+
+    def lookup_words(self, words):
+        # entries of each of words, [] when it is not in the dictionaries
+        keys = [word.encode('utf-8') for word in words]
+        results = [[] for _ in words]
+        for dic in self._dics():
+            for entries, word, result in zip(results, words, dic.exact_match_search_many(keys)):
+                if result >= 0:
+                    entries.extend(self._entries(dic, result, word))
+        return results
+
+    def prefix_words(self, words):
+        # entries of the dictionary words which are prefixes of each of words, shortest first
+        keys = [word.encode('utf-8') for word in words]
+        results = [[] for _ in words]
+        for dic in self._dics():
+            for entries, key, matched in zip(results, keys, dic.common_prefix_search_many(keys)):
+                for result, ln in matched:
+                    if ln:
+                        entries.extend(self._entries(dic, result, key[:ln].decode('utf-8')))
+        if self.user_dic:
+            for entries in results:
+                entries.sort(key=lambda entry: len(entry[0]))
+        return results
+
+    def find_words(self, s):
+        # (start, end, surface, feature) of every dictionary word in s, start and end are character offsets
+        b = s.encode('utf-8')
+        char_pos = []   # character offset of each byte offset
+        n = -1
+        for c in b:
+            if (c & 0b11000000) != 0b10000000:
+                n += 1
+            char_pos.append(n)
+        char_pos.append(len(s))
+
+        results = []
+        for dic in self._dics():
+            for start, end, result in dic.find_all(b):
+                start, end = char_pos[start], char_pos[end]
+                results.extend(
+                    (start, end) + entry for entry in self._entries(dic, result, s[start:end])
+                )
+        if self.user_dic:
+            results.sort(key=lambda r: (r[0], r[1]))
+        return results
+
+    def dictionary_words(self, prefix=""):
+        # words in the dictionaries which start with prefix, in code point order
+        prefix = prefix.encode('utf-8')
+        prev = None
+        for word in heapq.merge(*[
+            (key.decode('utf-8') for key, _ in dic.keys(prefix)) for dic in self._dics()
+        ]):
+            if word != prev:
+                yield word
+            prev = word
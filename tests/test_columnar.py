@@ -0,0 +1,72 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+import json
+import unittest
+from pyawabi.tokenizer import Tokenizer
+from pyawabi.columnar import Columnar, compile_node_format
+
+
+class TestColumnar(unittest.TestCase):
+    def test_tokenize_columnar(self):
+        tokenizer = Tokenizer(None)
+        sentences = ["すもももももももものうち", "", "山嵐は might is right"]
+        c = tokenizer.tokenize_columnar(sentences)
+        tokens = [token for s in sentences for token in tokenizer.tokenize(s)]
+        self.assertEqual(len(c), len(tokens))
+        self.assertEqual(c.surfaces(sentences), [token[0] for token in tokens])
+        self.assertEqual([c.features[i] for i in c.feature_ids], [token[1] for token in tokens])
+        self.assertEqual(len(c.features), len(set(token[1] for token in tokens)))
+        self.assertEqual(list(c.sentence_ids), [0] * 7 + [2] * 5)
+        self.assertEqual((c.starts[9], c.ends[9]), (4, 9))     # might
+
+        b = tokenizer.tokenize_columnar(sentences, byte_offsets=True)
+        self.assertEqual(
+            [surface.decode('utf-8') for surface in b.surfaces([s.encode('utf-8') for s in sentences])],
+            [token[0] for token in tokens]
+        )
+
+        self.assertEqual(Columnar.from_binary(c.to_binary()), c)
+        self.assertEqual(json.loads(c.to_json())["features"], c.features)
+
+        c = tokenizer.tokenize_columnar(sentences, include_pos=["名詞"])
+        self.assertEqual(c.surfaces(sentences), ["すもも", "もも", "もも", "うち", "山嵐", "might", "is", "right"])
+
+    def test_node_format(self):
+        feature = "名詞,一般,*,*,*,*,すもも,スモモ,スモモ"
+        self.assertEqual(
+            compile_node_format(r"%m\t%H\n")("すもも", feature, 0, 9),
+            "すもも\t名詞,一般,*,*,*,*,すもも,スモモ,スモモ\n"
+        )
+        self.assertEqual(
+            compile_node_format(r"%m %f[0] %F-[0,1] %f[9] %ps %pe %%\n")("すもも", feature, 0, 9),
+            "すもも 名詞 名詞-一般  0 9 %\n"
+        )
+        self.assertEqual(compile_node_format("EOS")("すもも", feature, 0, 9), "EOS")
+        with self.assertRaises(ValueError):
+            compile_node_format("%x")
+
+
+if __name__ == "__main__":
+    unittest.main()
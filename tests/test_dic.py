@@ -59,6 +59,10 @@ class TestDic(unittest.TestCase):
         s = "もももももも".encode('utf-8')
         self.assertEqual(len(sys_dic.common_prefix_search(s)), 2)
         self.assertEqual(len(sys_dic.lookup(s)), 4)
+        self.assertEqual(
+            sys_dic.lookup_costs(b"x" + s, 1),
+            [(len(e.original), e.lc_attr, e.rc_attr, e.wcost) for e in sys_dic.lookup(s)]
+        )
 
     def test_lookup_unknowns(self):
         unk_dic = MecabDic(mecabrc.get_dic_path(self.mecabrc_map, "unk.dic"))
@@ -66,6 +70,48 @@ class TestDic(unittest.TestCase):
         self.assertEqual(unk_dic.exact_match_search(b'SPACE'), 9729)
         entries, invoke = unk_dic.lookup_unknowns("１９６７年".encode("utf-8"), cp)
         self.assertEqual(entries[0][0], "１９６７".encode("utf-8"))
+        self.assertEqual(
+            unk_dic.lookup_unknown_costs("１９６７年".encode("utf-8"), cp),
+            [(len(e.original), e.lc_attr, e.rc_attr, e.wcost, e.skip) for e in entries]
+        )
+
+    def test_lookup_many(self):
+        sys_dic = MecabDic(mecabrc.get_dic_path(self.mecabrc_map, "sys.dic"))
+        keys = [
+            "もも".encode('utf-8'),
+            "すもも".encode('utf-8'),
+            "すもももも".encode('utf-8'),
+            b"",
+            "すも".encode('utf-8'),
+            "もも".encode('utf-8'),
+        ]
+        self.assertEqual(
+            sys_dic.exact_match_search_many(keys),
+            [sys_dic.exact_match_search(s) for s in keys]
+        )
+        self.assertEqual(
+            sys_dic.common_prefix_search_many(keys),
+            [sys_dic.common_prefix_search(s) for s in keys]
+        )
+
+    def test_find_all(self):
+        sys_dic = MecabDic(mecabrc.get_dic_path(self.mecabrc_map, "sys.dic"))
+        s = "すもものうち".encode('utf-8')
+        words = [s[start:end].decode('utf-8') for start, end, _ in sys_dic.find_all(s)]
+        self.assertEqual(words, [
+            "す", "すも", "すもも", "も", "もも", "も", "もの", "ものう", "の", "のう", "う", "うち", "ち"
+        ])
+
+    def test_keys(self):
+        sys_dic = MecabDic(mecabrc.get_dic_path(self.mecabrc_map, "sys.dic"))
+        keys = list(sys_dic.keys("すもも".encode('utf-8')))
+        self.assertEqual(keys, [("すもも".encode('utf-8'), sys_dic.exact_match_search("すもも".encode('utf-8')))])
+        keys = [key for key, _ in sys_dic.keys("もも".encode('utf-8'))]
+        self.assertEqual(keys, sorted(keys))
+        self.assertIn("ももんが".encode('utf-8'), keys)
+        for key, result in sys_dic.keys("もも".encode('utf-8')):
+            self.assertEqual(sys_dic.exact_match_search(key), result)
+        self.assertEqual(list(sys_dic.keys(b"\xff")), [])
 
 
 if __name__ == "__main__":
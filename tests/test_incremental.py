@@ -0,0 +1,88 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+import random
+import unittest
+from pyawabi.tokenizer import Tokenizer
+from pyawabi.incremental import IncrementalTokenizer
+
+
+class TestIncrementalTokenizer(unittest.TestCase):
+    def test_edit(self):
+        tokenizer = Tokenizer(None)
+        inc = IncrementalTokenizer(tokenizer)
+        self.assertEqual(inc.tokenize(), [])
+
+        s = "すもももももももものうち"
+        self.assertEqual(inc.edit(0, 0, s), tokenizer.tokenize(s))
+        s = "すもももももももものうち、母はハハハと笑う"
+        self.assertEqual(inc.edit(12, 0, "、母はハハハと笑う"), tokenizer.tokenize(s))
+        s = "すもももももものうち、母はハハハと笑う"
+        self.assertEqual(inc.edit(3, 2, ""), tokenizer.tokenize(s))
+        self.assertEqual(inc.text, s)
+        self.assertEqual(inc.edit(0, len(s), ""), [])
+
+    def test_random_edit(self):
+        tokenizer = Tokenizer(None)
+        s = "山嵐は might is right という英語を引いて説諭を加えた。１９６７年、母はハハハと笑う。"
+        chars = list(set(s))
+        inc = IncrementalTokenizer(tokenizer, s)
+        rnd = random.Random(0)
+        for i in range(200):
+            offset = rnd.randint(0, len(s))
+            length = rnd.randint(0, min(3, len(s) - offset))
+            inserted = "".join(rnd.choice(chars) for _ in range(rnd.randint(0, 3)))
+            s = s[:offset] + inserted + s[offset+length:]
+            self.assertEqual(inc.edit(offset, length, inserted), tokenizer.tokenize(s))
+
+    def test_segments(self):
+        tokenizer = Tokenizer(None)
+        s = "山嵐は might is right という英語を引いて説諭を加えた。 母はハハハと笑う。\n" * 30
+        chars = list(set(s))
+        inc = IncrementalTokenizer(tokenizer, s)
+        self.assertGreater(len(inc.segments), 1)
+        rnd = random.Random(0)
+        for i in range(100):
+            offset = rnd.randint(0, len(s))
+            length = rnd.randint(0, min(rnd.choice([3, 100]), len(s) - offset))
+            inserted = "".join(rnd.choice(chars) for _ in range(rnd.choice([1, 100])))
+            s = s[:offset] + inserted + s[offset+length:]
+            self.assertEqual(inc.edit(offset, length, inserted), tokenizer.tokenize(s))
+        self.assertEqual(inc.text, s)
+        self.assertEqual(inc.set_text("すもももももももものうち"), tokenizer.tokenize("すもももももももものうち"))
+
+    def test_edit_range(self):
+        s = "すもももももももものうち"
+        inc = IncrementalTokenizer(Tokenizer(None), s)
+        for offset, length in [(-1, 0), (len(s) + 1, 0), (len(s), 1), (10, 3)]:
+            with self.assertRaises(IndexError):
+                inc.edit(offset, length, "も")
+        with self.assertRaises(ValueError):
+            inc.edit(3, -1, "も")
+        self.assertEqual(inc.text, s)
+        self.assertEqual(inc.edit(len(s), 0, ""), Tokenizer(None).tokenize(s))
+
+
+if __name__ == "__main__":
+    unittest.main()
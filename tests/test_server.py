@@ -0,0 +1,90 @@
+################################################################################
+# MIT License
+#
+# Copyright (c) 2020 Hajime Nakagami
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pyawabi.tokenizer import Tokenizer
+from pyawabi.server import create_server
+from pyawabi.client import Client
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "pyawabi.sock")
+        self.server = create_server(self.path, workers=1)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.batcher.close()
+        self.thread.join()
+        self.tmpdir.cleanup()
+
+    def test_client(self):
+        tokenizer = Tokenizer(None)
+        s = "すもももももももものうち"
+        with Client(self.path) as c:
+            self.assertEqual(c.tokenize(s), tokenizer.tokenize(s))
+            self.assertEqual(c.tokenize(s, include_pos=["名詞"]), tokenizer.tokenize(s, ["名詞"]))
+            self.assertEqual(c.tokenize_n_best(s, 3), tokenizer.tokenize_n_best(s, 3))
+            self.assertEqual(c.wakati(s), tokenizer.wakati(s))
+            with self.assertRaises(RuntimeError):
+                c.request("unknown", text=s)
+            stats = c.stats()
+            self.assertEqual(stats["requests"], 5)
+            self.assertEqual(stats["errors"], 1)
+
+    def test_bad_request(self):
+        s = "すもももももももものうち"
+        with Client(self.path) as c:
+            c.sock.sendall(b'[1]\n"x"\n')
+            for i in range(2):
+                res = json.loads(c.rfile.readline())
+                self.assertIsNone(res["id"])
+                self.assertIn("error", res)
+            for kwargs in [{"text": s, "n": -1}, {"text": s, "n": 1000}, {"text": s, "n": "2"}, {"text": 1, "n": 2}]:
+                with self.assertRaises(RuntimeError):
+                    c.request("nbest", **kwargs)
+            with self.assertRaises(RuntimeError):
+                c.request("tokenize", text=None)
+            # the connection is still alive
+            self.assertEqual(c.wakati("すもも"), ["すもも"])
+
+    def test_not_a_socket(self):
+        path = os.path.join(self.tmpdir.name, "file")
+        with open(path, "w") as f:
+            f.write("x")
+        with self.assertRaises(FileExistsError):
+            create_server(path, workers=1)
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
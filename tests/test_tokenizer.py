@@ -23,6 +23,7 @@
 ################################################################################
 
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 import pyawabi
 from pyawabi import mecabrc
 from pyawabi.tokenizer import Tokenizer
@@ -92,6 +93,81 @@ class TestTokenizer(unittest.TestCase):
             14
         )
 
+    def test_wakati(self):
+        tokenizer = Tokenizer(None)
+        s = "山嵐は might is right という英語を引いて説諭を加えた"
+        surfaces = [token[0] for token in tokenizer.tokenize(s)]
+        self.assertEqual(tokenizer.wakati(s), surfaces)
+        self.assertEqual(pyawabi.wakati(s), surfaces)
+        self.assertEqual(
+            [s[start:end] for start, end in tokenizer.wakati_offsets(s)],
+            surfaces
+        )
+        self.assertEqual(tokenizer.wakati_offsets(s)[2], (4, 9))    # might
+
+    def test_dictionary_words(self):
+        tokenizer = Tokenizer(None)
+        sumomo = ("すもも", "名詞,一般,*,*,*,*,すもも,スモモ,スモモ")
+        self.assertEqual(tokenizer.lookup_words(["すもも", "すもー", ""]), [[sumomo], [], []])
+        prefixes = tokenizer.prefix_words(["すももの", "x"])
+        self.assertEqual(prefixes[0][-1], sumomo)
+        self.assertEqual(sorted({surface for surface, _ in prefixes[0]}), ["す", "すも", "すもも"])
+        self.assertEqual(prefixes[1], [])
+        s = "母はすももの"
+        for start, end, surface, feature in tokenizer.find_words(s):
+            self.assertEqual(s[start:end], surface)
+            self.assertIn((surface, feature), tokenizer.lookup_words([surface])[0])
+        self.assertIn((2, 5) + sumomo, tokenizer.find_words(s))
+        words = list(tokenizer.dictionary_words("すもも"))
+        self.assertEqual(words[0], "すもも")
+        self.assertEqual(words, sorted(words))
+        self.assertTrue(all(word.startswith("すもも") for word in words))
+
+    def test_pos_filter(self):
+        tokenizer = Tokenizer(None)
+        s = "すもももももももものうち"
+        self.assertEqual(
+            [token[0] for token in tokenizer.tokenize(s, include_pos=["名詞"])],
+            ["すもも", "もも", "もも", "うち"]
+        )
+        self.assertEqual(
+            [token[0] for token in tokenizer.tokenize(s, include_pos="名詞,一般")],
+            ["すもも", "もも", "もも"]
+        )
+        self.assertEqual(
+            [token[0] for token in tokenizer.tokenize(s, exclude_pos=["助詞", "名詞,非自立"])],
+            ["すもも", "もも", "もも"]
+        )
+        self.assertEqual(tokenizer.tokenize(s, include_pos=["名"]), [])
+        self.assertEqual(
+            [len(tokens) for tokens in tokenizer.tokenize_n_best(s, 3, include_pos=["助詞"])],
+            [3, 3, 3]
+        )
+
+    def test_threads(self):
+        # one Tokenizer shared by many threads
+        tokenizer = Tokenizer(None)
+        texts = [
+            "すもももももももものうち",
+            "母はハハハと笑う",
+            "山嵐は might is right という英語を引いて説諭を加えた",
+            "１９６７年、吾輩は猫である。",
+        ]
+        expected = [tokenizer.tokenize(s) for s in texts]
+        expected_wakati = [tokenizer.wakati(s) for s in texts]
+
+        def run(i):
+            for j in range(50):
+                k = (i + j) % len(texts)
+                if tokenizer.tokenize(texts[k]) != expected[k]:
+                    return False
+                if tokenizer.wakati(texts[k]) != expected_wakati[k]:
+                    return False
+            return True
+
+        with ThreadPoolExecutor(8) as executor:
+            self.assertTrue(all(executor.map(run, range(16))))
+
 
 if __name__ == "__main__":
     unittest.main()
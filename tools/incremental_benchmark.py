@@ -0,0 +1,43 @@
+# latency of IncrementalTokenizer.edit() by the length of the text
+#
+# Every edit types one character at a random offset, then deletes it, so
+# the text keeps its length. The edit latency should not grow with it.
+#
+# $ python tools/incremental_benchmark.py --chars 500 2500 10000
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from pyawabi.tokenizer import Tokenizer
+from pyawabi.incremental import IncrementalTokenizer
+
+PROSE = "山嵐は might is right という英語を引いて説諭を加えた。吾輩は猫である。名前はまだ無い。母はハハハと笑う。"
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--chars', type=int, nargs='+', default=[500, 2500, 10000])
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tokenizer = Tokenizer()
+    for chars in args.chars:
+        s = (PROSE * (chars // len(PROSE) + 1))[:chars]
+        inc = IncrementalTokenizer(tokenizer, s)
+        rnd = random.Random(args.seed)
+        times = []
+        for _ in range(args.edits):
+            offset = rnd.randint(0, len(s))
+            for edit in [(offset, 0, rnd.choice(PROSE)), (offset, 1, "")]:
+                start = time.perf_counter()
+                inc.edit(*edit)
+                times.append(time.perf_counter() - start)
+        assert inc.tokenize() == tokenizer.tokenize(s)
+        times.sort()
+        print("{:6d} chars: median {:.2f}ms  p90 {:.2f}ms".format(
+            chars, times[len(times) // 2] * 1000, times[len(times) * 9 // 10] * 1000))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
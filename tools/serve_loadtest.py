@@ -0,0 +1,62 @@
+# load test of `pyawabi serve`
+#
+# $ pyawabi serve --unix /tmp/pyawabi.sock &
+# $ python tools/serve_loadtest.py --unix /tmp/pyawabi.sock --clients 8 --requests 1000
+import sys
+import time
+import threading
+from argparse import ArgumentParser
+from pyawabi.client import Client
+
+TEXTS = [
+    "すもももももももものうち",
+    "山嵐は might is right という英語を引いて説諭を加えた",
+    "吾輩は猫である。名前はまだ無い。",
+    "母はハハハと笑う",
+]
+
+
+def run(args, latencies, i):
+    with Client(args.unix, args.host, args.port) as c:
+        for j in range(args.requests):
+            s = TEXTS[(i + j) % len(TEXTS)]
+            start = time.perf_counter()
+            if args.op == 'wakati':
+                c.wakati(s)
+            elif args.op == 'nbest':
+                c.tokenize_n_best(s, 2)
+            else:
+                c.tokenize(s)
+            latencies.append(time.perf_counter() - start)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--unix')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--op', choices=['tokenize', 'nbest', 'wakati'], default='tokenize')
+    args = parser.parse_args()
+
+    latencies = []
+    threads = [threading.Thread(target=run, args=(args, latencies, i)) for i in range(args.clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    n = len(latencies)
+    print("requests: {} in {:.3f}s ({:.1f} req/s)".format(n, elapsed, n / elapsed))
+    for p in (50, 90, 99):
+        print("p{}: {:.2f}ms".format(p, latencies[min(n - 1, n * p // 100)] * 1000))
+    with Client(args.unix, args.host, args.port) as c:
+        print("server:", c.stats())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# throughput of one Tokenizer shared by threads
+#
+# On free-threaded CPython (3.13t or later) throughput should scale with
+# the number of threads, with the GIL it stays flat.
+#
+# $ python tools/thread_benchmark.py --threads 1 2 4 8
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from pyawabi.tokenizer import Tokenizer
+
+TEXTS = [
+    "すもももももももものうち",
+    "山嵐は might is right という英語を引いて説諭を加えた",
+    "吾輩は猫である。名前はまだ無い。",
+    "母はハハハと笑う",
+]
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=1000)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("python {} GIL {}".format(sys.version.split()[0], "enabled" if gil else "disabled"))
+
+    tokenizer = Tokenizer()
+
+    def run(i):
+        tokenizer.tokenize(TEXTS[i % len(TEXTS)])
+
+    def warm_up(barrier):
+        # the barrier makes every thread of the pool take one warm up task
+        barrier.wait()
+        for i in range(args.warmup):
+            run(i)
+
+    # page in the dictionaries before anything is timed
+    for i in range(args.warmup):
+        run(i)
+
+    # the ratios are always against one thread, measured first
+    base = None
+    for n in sorted(set(args.threads) | {1}):
+        with ThreadPoolExecutor(n) as executor:
+            barrier = threading.Barrier(n)
+            for f in [executor.submit(warm_up, barrier) for _ in range(n)]:
+                f.result()
+            start = time.perf_counter()
+            list(executor.map(run, range(args.requests)))
+            elapsed = time.perf_counter() - start
+        throughput = args.requests / elapsed
+        if base is None:
+            base = throughput
+        print("threads {:3d}: {:8.1f} req/s  x{:.2f}".format(n, throughput, throughput / base))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# time of Tokenizer.wakati() against Tokenizer.tokenize() of the same text
+#
+# "prose" repeats a few sentences, "words" joins distinct dictionary words
+# so that most lookups miss the entry cache.
+#
+# $ python tools/wakati_benchmark.py --chars 2500 --words 3000
+import itertools
+import sys
+import time
+from argparse import ArgumentParser
+from pyawabi.tokenizer import Tokenizer
+
+PROSE = "山嵐は might is right という英語を引いて説諭を加えた。吾輩は猫である。名前はまだ無い。母はハハハと笑う。"
+
+
+def best_of(repeat, f, s):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(s)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--chars', type=int, default=2500)
+    parser.add_argument('--words', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tokenizer = Tokenizer()
+    texts = [
+        ("prose", (PROSE * (args.chars // len(PROSE) + 1))[:args.chars]),
+        ("words", "。".join(itertools.islice(tokenizer.dictionary_words("か"), args.words))),
+    ]
+    for name, s in texts:
+        assert tokenizer.wakati(s) == [token[0] for token in tokenizer.tokenize(s)]
+        t = best_of(args.repeat, tokenizer.tokenize, s)
+        w = best_of(args.repeat, tokenizer.wakati, s)
+        print("{:5s} {:6d} chars: tokenize {:.3f}s  wakati {:.3f}s  x{:.2f}".format(name, len(s), t, w, t / w))
+
+
+if __name__ == "__main__":
+    sys.exit(main())